@@ -1,9 +1,191 @@
 """
 Simple IoT Rules Engine
 """
+import functools
+import operator
+import sys
 import time
-from typing import Dict, Any, List
-from .storage import StorageBackend, Rule
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from .storage import StorageBackend, Rule, RuleIndex, condition_source
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Shared result for the common no-match case, so it is never allocated
+_EMPTY = ()
+
+_SIMPLE_OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt,
+               '<=': operator.le, '==': operator.eq}
+_SIMPLE_OP_CODES = {'>': 0, '>=': 1, '<': 2, '<=': 3, '==': 4}
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _eval_batch_jit(data, thresholds, ops, field_idx):
+        n_messages = data.shape[0]
+        n_rules = thresholds.shape[0]
+        fired = np.zeros((n_messages, n_rules), dtype=np.bool_)
+        for i in prange(n_messages):
+            for j in range(n_rules):
+                value = data[i, field_idx[j]]
+                op = ops[j]
+                if op == 0:
+                    fired[i, j] = value > thresholds[j]
+                elif op == 1:
+                    fired[i, j] = value >= thresholds[j]
+                elif op == 2:
+                    fired[i, j] = value < thresholds[j]
+                elif op == 3:
+                    fired[i, j] = value <= thresholds[j]
+                else:
+                    fired[i, j] = value == thresholds[j]
+        return fired
+else:
+    _eval_batch_jit = None
+
+
+def _build_fused(rules: List[Rule]):
+    """Codegen one function that evaluates every rule in a single frame
+
+    Emits source of the shape
+
+        def _fused(m):
+            out = []
+            _a = out.append
+            _k = m.keys()
+            if _f0 <= _k and (m['temperature'] > 25): _a(_act0)
+            ...
+            return out
+
+    and compiles it once. Replaces one Python call per rule per message
+    with a single function frame for the whole rule set. Returns None if
+    any rule cannot be expressed this way.
+    """
+    if not rules:
+        return None
+
+    lines = ['def _fused(m):',
+             '    out = []',
+             '    _a = out.append',
+             '    _k = m.keys()']
+    namespace = {}
+    for i, rule in enumerate(rules):
+        expr = condition_source(rule.condition)
+        if expr is None or rule.fields is None:
+            return None
+        namespace[f'_act{i}'] = rule.action
+        if rule.fields:
+            namespace[f'_f{i}'] = rule.fields
+            lines.append(f'    if _f{i} <= _k and ({expr}): _a(_act{i})')
+        else:
+            lines.append(f'    if {expr}: _a(_act{i})')
+    lines.append('    return out')
+
+    exec(compile('\n'.join(lines), '<fused-rules>', 'exec'), namespace)
+    return namespace['_fused']
+
+
+def _build_any_fire(rules: List[Rule]):
+    """Combine every rule condition into one OR-ed predicate
+
+    Emits `return (guard and (cond)) or (guard and (cond)) or ...`, so a
+    yes/no check over the whole rule set is a single compiled expression
+    that short-circuits in bytecode, with no Python-level loop. Returns
+    None if any rule cannot be expressed this way.
+    """
+    if not rules:
+        return None
+
+    namespace = {}
+    parts = []
+    for i, rule in enumerate(rules):
+        expr = condition_source(rule.condition)
+        if expr is None or rule.fields is None:
+            return None
+        if rule.fields:
+            namespace[f'_f{i}'] = rule.fields
+            parts.append(f'(_f{i} <= _k and ({expr}))')
+        else:
+            parts.append(f'({expr})')
+
+    source = ('def _any(m):\n'
+              '    _k = m.keys()\n'
+              '    return ' + ' or '.join(parts))
+    exec(compile(source, '<any-fire>', 'exec'), namespace)
+    return namespace['_any']
+
+
+def _build_rule_kernel(rule: Rule):
+    """JIT-compile a rule condition into a kernel over field columns
+
+    Generates `def _k(field, ...): return <condition>` with one float64
+    array argument per referenced field and compiles it with Numba, so a
+    whole batch is evaluated in machine code. Compilation is pre-warmed
+    with zero-length arrays to keep the first real batch fast. Returns
+    None when Numba is missing or the condition does not compile (e.g.
+    it uses and/or, which Numba rejects on arrays).
+    """
+    if njit is None or rule.predicate is None or not rule.fields:
+        return None
+    args = sorted(rule.fields)
+    source = 'def _k({}):\n    return {}'.format(', '.join(args), rule.condition)
+    namespace = {}
+    try:
+        exec(compile(source, '<rule-kernel>', 'exec'), namespace)
+        kernel = njit(cache=True, fastmath=True)(namespace['_k'])
+        empty = np.empty(0, dtype=np.float64)
+        kernel(*([empty] * len(args)))
+    except Exception:
+        return None
+    return kernel
+
+
+_MSG_CLASSES = {}
+
+
+def _message_context(message: Dict[str, Any]):
+    """Wrap a message in a __slots__ object keyed by its field set
+
+    One tiny class is generated per distinct key set and reused, so
+    attribute-rewritten predicates run against a fixed-shape object and
+    benefit from CPython's inline attribute caches.
+    """
+    keys = frozenset(message)
+    cls = _MSG_CLASSES.get(keys)
+    if cls is None:
+        cls = _MSG_CLASSES[keys] = type('_Msg', (), {'__slots__': tuple(keys)})
+    ctx = cls()
+    for key, value in message.items():
+        setattr(ctx, key, value)
+    return ctx
+
+
+def _field_column(messages: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """Stack one message field into a float64 array (NaN where missing)"""
+    def values():
+        for message in messages:
+            value = message.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield value
+            else:
+                yield np.nan
+    return np.fromiter(values(), dtype=np.float64, count=len(messages))
+
+
+def _field_presence(messages: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """Boolean mask of which messages actually carry a field
+
+    Kept separate from the NaN fill in _field_column: NaN also encodes
+    present-but-mistyped values, which under != must keep firing like
+    the scalar path does, while truly missing fields must not.
+    """
+    return np.fromiter((field in message for message in messages),
+                       dtype=np.bool_, count=len(messages))
 
 
 class RulesEngine:
@@ -11,61 +193,503 @@ class RulesEngine:
     
     def __init__(self, storage: StorageBackend):
         self.storage = storage
-        self.stats = {
-            'messages_processed': 0,
-            'rules_triggered': 0,
-            'processing_time': 0.0
-        }
-    
-    def add_rule(self, condition: str, action: str) -> str:
-        """Add a new rule to the engine"""
-        rule = Rule(condition, action)
+        self._rules_cache = None
+        self._rules_version = None
+        self._index = None
+        self._actions_by_index = []
+        self._fused = None
+        self._fused_built = False
+        self._any_fire = None
+        self._any_fire_built = False
+        self._has_one_shot = False
+        self._fired_one_shot = set()
+        # Telemetry streams repeat readings; identical payloads hit this
+        # instead of re-evaluating the rule set
+        self._memo = functools.lru_cache(maxsize=1024)(self._match_actions_by_key)
+        # Set to False to strip all timing/counting from the hot path
+        self.stats_enabled = True
+        self._messages_processed = 0
+        self._rules_triggered = 0
+        self._total_ns = 0
+
+    def add_rule(self, condition: str, action: str, one_shot: bool = False) -> str:
+        """Add a new rule to the engine
+
+        The condition is validated here, once, instead of silently
+        failing on every message: anything that does not parse into a
+        supported comparison/boolean expression raises ValueError.
+        One-shot rules stop firing after their first trigger until
+        reset_statistics re-arms them.
+        """
+        # Interned action strings make repeated triggers share one object
+        rule = Rule(condition, sys.intern(action))
+        if rule.predicate is None:
+            raise ValueError(f"Invalid rule condition: {condition!r}")
+        rule.one_shot = one_shot
         return self.storage.add_rule(rule)
-    
-    def process_message(self, message: Dict[str, Any]) -> List[str]:
+
+    def process_message(self, message: Dict[str, Any]) -> Sequence[str]:
         """Process an IoT message against all rules"""
-        start_time = time.time()
-        triggered_actions = []
-        
-        rules = self.storage.get_all_rules()
-        for rule in rules:
-            if self._evaluate_condition(rule.condition, message):
-                triggered_actions.append(rule.action)
-                self.stats['rules_triggered'] += 1
-        
-        self.stats['messages_processed'] += 1
-        self.stats['processing_time'] += time.time() - start_time
-        
+        if not self.stats_enabled:
+            return self._cached_match(message)
+
+        start_ns = time.perf_counter_ns()
+        triggered_actions = self._cached_match(message)
+        self._total_ns += time.perf_counter_ns() - start_ns
+        self._messages_processed += 1
+        self._rules_triggered += len(triggered_actions)
         return triggered_actions
-    
-    def _evaluate_condition(self, condition: str, message: Dict[str, Any]) -> bool:
-        """Simple condition evaluation"""
+
+    def _cached_match(self, message: Dict[str, Any]) -> Sequence[str]:
+        """Look a message up in the memo before evaluating any rule
+
+        The snapshot is refreshed first so a storage change empties the
+        memo; unhashable field values simply skip the cache.
+        """
+        self._refresh_snapshot()
+        if self._has_one_shot:
+            # Firing changes future results, so memoization is unsound
+            return self._match_actions(message)
+        try:
+            result = self._memo(tuple(sorted(message.items())))
+        except TypeError:
+            return self._match_actions(message)
+        # Copy so callers cannot mutate the cached list
+        return list(result) if result else _EMPTY
+
+    def _match_actions_by_key(self, items: tuple) -> Sequence[str]:
+        return self._match_actions(dict(items))
+
+    def process_many(self, messages: List[Dict[str, Any]]) -> List[Sequence[str]]:
+        """Process several messages with one timing read for the whole run"""
+        if not self.stats_enabled:
+            return [self._match_actions(message) for message in messages]
+
+        start_ns = time.perf_counter_ns()
+        results = [self._match_actions(message) for message in messages]
+        self._total_ns += time.perf_counter_ns() - start_ns
+        self._messages_processed += len(messages)
+        self._rules_triggered += sum(len(actions) for actions in results)
+        return results
+
+    def any_match(self, message: Dict[str, Any]) -> Optional[str]:
+        """Return the first triggered action, or None if no rule fires
+
+        Early-exit path for callers that only need "did anything match?"
+        (e.g. alerting): evaluation stops at the first firing rule
+        instead of scanning the whole rule set.
+        """
+        index = self._get_index()
+
+        matched = index.match_simple(message)
+        if matched:
+            return matched[0].action
+
+        for rule in index.candidates(message):
+            if rule.predicate is not None and rule.fields:
+                # Field presence is pre-filtered; a value of the wrong
+                # type still must not fire rather than raise
+                try:
+                    fired = rule.predicate(message)
+                except TypeError:
+                    fired = False
+            else:
+                fired = self._evaluate_condition(rule, message)
+            if fired:
+                return rule.action
+        return None
+
+    def any_fire(self, message: Dict[str, Any]) -> bool:
+        """Return whether any rule fires, via one combined OR predicate
+
+        The whole rule set collapses into a single compiled expression
+        that short-circuits internally, making this the cheapest
+        possible yes/no check.
+        """
+        self._refresh_snapshot()
+        if not self._any_fire_built:
+            self._any_fire = _build_any_fire(self._rules_cache)
+            self._any_fire_built = True
+        if self._any_fire is not None:
+            try:
+                return bool(self._any_fire(message))
+            except TypeError:
+                # Same fallback as the fused path: a mistyped field
+                # value must not fire, and must not raise either
+                pass
+        return self.any_match(message) is not None
+
+    def _match_actions(self, message: Dict[str, Any]) -> Sequence[str]:
+        """Collect the actions of all rules triggered by a message
+
+        Returns a shared empty tuple when nothing fires, so the common
+        no-match case allocates no list at all.
+        """
+        index = self._get_index()
+
+        if self._has_one_shot:
+            return self._match_one_shot(message, index)
+
+        if not self._fused_built:
+            self._fused = _build_fused(self._rules_cache)
+            self._fused_built = True
+        if self._fused is not None:
+            # Single compiled frame evaluates the whole rule set
+            try:
+                return self._fused(message) or _EMPTY
+            except TypeError:
+                # A field carries a non-comparable value; fall through
+                # to the guarded loop, where a type mismatch simply
+                # does not fire
+                pass
+
+        table = self._actions_by_index
+        triggered = None
+        fired = None
+
+        # Range-indexed rules are resolved by bisect, no evaluation needed
+        for rule in index.match_simple(message):
+            if triggered is None:
+                triggered = [rule.action_idx]
+                fired = {rule.action_idx}
+            else:
+                triggered.append(rule.action_idx)
+                fired.add(rule.action_idx)
+
+        # Once every distinct action has fired, no remaining rule can
+        # add a new one
+        if fired is None or len(fired) < len(table):
+            ctx = None
+            for rule in index.candidates(message):
+                # Candidates are pre-filtered to rules whose fields are
+                # all present, but values of the wrong type must still
+                # mean "does not fire", not a TypeError to the caller
+                if rule.attr_predicate is not None and rule.fields:
+                    if ctx is None:
+                        ctx = _message_context(message)
+                    try:
+                        hit = rule.attr_predicate(ctx)
+                    except TypeError:
+                        hit = False
+                else:
+                    hit = self._evaluate_condition(rule, message)
+                if hit:
+                    if triggered is None:
+                        triggered = [rule.action_idx]
+                        fired = {rule.action_idx}
+                    else:
+                        triggered.append(rule.action_idx)
+                        fired.add(rule.action_idx)
+                    if len(fired) == len(table):
+                        break
+
+        if triggered is None:
+            return _EMPTY
+        # Convert the collected indices back to the shared action strings
+        return [table[idx] for idx in triggered]
+
+    def _match_one_shot(self, message: Dict[str, Any], index: RuleIndex) -> Sequence[str]:
+        """Per-rule matching that retires one-shot rules as they fire
+
+        The fused path and the memo cannot express a rule set that
+        shrinks as it fires, so rule sets containing one-shot rules take
+        this loop; the fired bucket keeps retired rules out of it.
+        """
+        fired_bucket = self._fired_one_shot
+        triggered = None
+
+        for rule in index.match_simple(message):
+            if rule.one_shot:
+                if rule in fired_bucket:
+                    continue
+                fired_bucket.add(rule)
+            if triggered is None:
+                triggered = [rule.action]
+            else:
+                triggered.append(rule.action)
+
+        ctx = None
+        for rule in index.candidates(message):
+            if rule.one_shot and rule in fired_bucket:
+                continue
+            if rule.attr_predicate is not None and rule.fields:
+                if ctx is None:
+                    ctx = _message_context(message)
+                try:
+                    hit = rule.attr_predicate(ctx)
+                except TypeError:
+                    hit = False
+            else:
+                hit = self._evaluate_condition(rule, message)
+            if hit:
+                if rule.one_shot:
+                    fired_bucket.add(rule)
+                if triggered is None:
+                    triggered = [rule.action]
+                else:
+                    triggered.append(rule.action)
+
+        return triggered if triggered is not None else _EMPTY
+
+    def process_batch(self, messages: List[Dict[str, Any]]) -> List[List[str]]:
+        """Process a batch of messages, vectorizing simple threshold rules
+
+        Simple `<field> <op> <number>` rules are evaluated as one NumPy
+        comparison over the whole batch; other rules fall back to the
+        per-message path. Returns one list of triggered actions per message.
+        """
+        start_ns = time.perf_counter_ns()
+
+        self._refresh_snapshot()
+        if messages and self._has_one_shot:
+            # Retirement is order-dependent, so batches containing
+            # one-shot rules run the per-message loop and retire rules
+            # mid-batch instead of the vectorized sweep
+            index = self._index
+            results = [list(self._match_one_shot(message, index))
+                       for message in messages]
+            if self.stats_enabled:
+                self._total_ns += time.perf_counter_ns() - start_ns
+                self._messages_processed += len(messages)
+                self._rules_triggered += sum(len(actions) for actions in results)
+            return results
+
+        results = [[] for _ in messages]
+
+        if messages:
+            simple_rules = []
+            general_rules = []
+            for rule in self._get_rules():
+                if rule.simple is not None:
+                    simple_rules.append(rule)
+                else:
+                    general_rules.append(rule)
+
+            columns = {}
+            presence = {}
+
+            if simple_rules and _eval_batch_jit is not None:
+                self._eval_simple_jit(simple_rules, messages, results)
+            else:
+                # Block rules sharing (field, op) and compare the whole
+                # group against its packed thresholds in one broadcast,
+                # so the column is read once per group instead of once
+                # per rule
+                groups = {}
+                for rule in simple_rules:
+                    field, op, _ = rule.simple
+                    groups.setdefault((field, op), []).append(rule)
+                for (field, op), group in groups.items():
+                    column = columns.get(field)
+                    if column is None:
+                        column = columns[field] = _field_column(messages, field)
+                    if len(group) == 1:
+                        rule = group[0]
+                        mask = _SIMPLE_OPS[op](column, rule.simple[2])
+                        for idx in np.nonzero(mask)[0]:
+                            results[idx].append(rule.action)
+                        continue
+                    thresholds = np.array([rule.simple[2] for rule in group],
+                                          dtype=np.float64)
+                    fired = _SIMPLE_OPS[op](column[:, None], thresholds[None, :])
+                    for j, rule in enumerate(group):
+                        for idx in np.nonzero(fired[:, j])[0]:
+                            results[idx].append(rule.action)
+
+            for rule in general_rules:
+                mask = self._eval_kernel(rule, messages, columns, presence)
+                if mask is None:
+                    mask = self._eval_predicate_columnwise(
+                        rule, messages, columns, presence)
+                if mask is not None:
+                    for idx in np.nonzero(mask)[0]:
+                        results[idx].append(rule.action)
+                else:
+                    for idx, message in enumerate(messages):
+                        if self._evaluate_condition(rule, message):
+                            results[idx].append(rule.action)
+
+        if self.stats_enabled:
+            self._total_ns += time.perf_counter_ns() - start_ns
+            self._messages_processed += len(messages)
+            self._rules_triggered += sum(len(actions) for actions in results)
+
+        return results
+
+    def reload_rules(self) -> None:
+        """Force the rules snapshot to be rebuilt on the next message"""
+        self._rules_cache = None
+        self._rules_version = None
+        self._index = None
+        self._actions_by_index = []
+        self._fused = None
+        self._fused_built = False
+        self._any_fire = None
+        self._any_fire_built = False
+        self._fired_one_shot.clear()
+        self._memo.cache_clear()
+
+    def _refresh_snapshot(self) -> None:
+        """Re-query storage only when its version changed"""
+        version = self.storage.version
+        if self._rules_cache is None or self._rules_version != version:
+            self._rules_cache = self.storage.get_all_rules()
+            self._index = RuleIndex(self._rules_cache)
+            self._has_one_shot = any(rule.one_shot for rule in self._rules_cache)
+            self._build_action_table()
+            self._rules_version = version
+            self._fused = None
+            self._fused_built = False
+            self._any_fire = None
+            self._any_fire_built = False
+            self._memo.cache_clear()
+
+    def _build_action_table(self) -> None:
+        """Assign each snapshot rule an index into the distinct-action table
+
+        The hot loop then collects small ints instead of strings and
+        converts back to the original action objects once per message.
+        """
+        table = self._actions_by_index = []
+        positions = {}
+        for rule in self._rules_cache:
+            idx = positions.setdefault(rule.action, len(table))
+            if idx == len(table):
+                table.append(rule.action)
+            rule.action_idx = idx
+
+    def _get_rules(self) -> List[Rule]:
+        self._refresh_snapshot()
+        return self._rules_cache
+
+    def _get_index(self) -> RuleIndex:
+        self._refresh_snapshot()
+        return self._index
+
+    @staticmethod
+    def _eval_kernel(rule: Rule, messages: List[Dict[str, Any]],
+                     columns: Dict[str, np.ndarray],
+                     presence: Dict[str, np.ndarray]):
+        """Run a rule's JIT kernel over the batch, building it on first use"""
+        kernel = rule.kernel
+        if kernel is None:
+            kernel = rule.kernel = _build_rule_kernel(rule) or False
+        if not kernel:
+            return None
+        for field in rule.fields:
+            if field not in columns:
+                columns[field] = _field_column(messages, field)
+        try:
+            mask = kernel(*(columns[field] for field in sorted(rule.fields)))
+        except Exception:
+            return None
+        if not (isinstance(mask, np.ndarray) and mask.dtype == np.bool_
+                and mask.shape == (len(messages),)):
+            return None
+        # Same presence masking as the column-wise path: the kernel sees
+        # NaN for missing fields, which a != comparison lets through
+        for field in rule.fields:
+            pres = presence.get(field)
+            if pres is None:
+                pres = presence[field] = _field_presence(messages, field)
+            mask = mask & pres
+        return mask
+
+    @staticmethod
+    def _eval_predicate_columnwise(rule: Rule, messages: List[Dict[str, Any]],
+                                   columns: Dict[str, np.ndarray],
+                                   presence: Dict[str, np.ndarray]):
+        """Run a rule's predicate over field columns instead of per message
+
+        Predicates subscript their argument, so feeding them the columns
+        dict turns every comparison into a NumPy ufunc over the whole
+        batch. Returns the boolean mask, or None when the condition does
+        not vectorize (e.g. it uses and/or), in which case the caller
+        falls back to per-message evaluation.
+        """
+        if rule.predicate is None or not rule.fields:
+            return None
+        for field in rule.fields:
+            if field not in columns:
+                columns[field] = _field_column(messages, field)
+        try:
+            mask = rule.predicate(columns)
+        except Exception:
+            return None
+        if not (isinstance(mask, np.ndarray) and mask.dtype == np.bool_
+                and mask.shape == (len(messages),)):
+            return None
+        # Messages lacking a referenced field must not fire, matching
+        # the scalar path's candidate pre-filter (NaN would slip
+        # through a != comparison)
+        for field in rule.fields:
+            pres = presence.get(field)
+            if pres is None:
+                pres = presence[field] = _field_presence(messages, field)
+            mask = mask & pres
+        return mask
+
+    @staticmethod
+    def _eval_simple_jit(simple_rules: List[Rule], messages: List[Dict[str, Any]],
+                         results: List[List[str]]) -> None:
+        """Evaluate simple threshold rules with the JIT-compiled kernel"""
+        field_pos = {}
+        for rule in simple_rules:
+            field_pos.setdefault(rule.simple[0], len(field_pos))
+
+        data = np.empty((len(messages), len(field_pos)), dtype=np.float64)
+        for field, pos in field_pos.items():
+            data[:, pos] = _field_column(messages, field)
+
+        thresholds = np.array([rule.simple[2] for rule in simple_rules], dtype=np.float64)
+        ops = np.array([_SIMPLE_OP_CODES[rule.simple[1]] for rule in simple_rules],
+                       dtype=np.int8)
+        field_idx = np.array([field_pos[rule.simple[0]] for rule in simple_rules],
+                             dtype=np.int64)
+
+        fired = _eval_batch_jit(data, thresholds, ops, field_idx)
+        for j, rule in enumerate(simple_rules):
+            for idx in np.nonzero(fired[:, j])[0]:
+                results[idx].append(rule.action)
+
+    def _evaluate_condition(self, rule: Rule, message: Dict[str, Any]) -> bool:
+        """Evaluate a rule's precompiled condition against a message"""
+        fast = rule.fast
+        if fast is not None:
+            # Simple threshold rule: a single C-level operator call
+            value = message.get(fast[0])
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return fast[1](value, fast[2])
+            return False
         try:
-            # Replace message field names with actual values
-            for key, value in message.items():
-                condition = condition.replace(key, str(value))
-            
-            # Basic evaluation for simple conditions
-            return eval(condition)
+            if rule.predicate is not None:
+                # Prebuilt function: direct call + dict subscript, no eval
+                return bool(rule.predicate(message))
+            if rule.compiled is None:
+                return False
+            # Message fields act directly as variable bindings
+            return bool(eval(rule.compiled, {'__builtins__': {}}, message))
         except:
             return False
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get engine statistics"""
-        avg_time = (self.stats['processing_time'] / self.stats['messages_processed'] 
-                   if self.stats['messages_processed'] > 0 else 0)
-        
+        total_time = self._total_ns * 1e-9
+        avg_time = (total_time / self._messages_processed
+                    if self._messages_processed > 0 else 0)
+
         return {
-            'messages_processed': self.stats['messages_processed'],
-            'rules_triggered': self.stats['rules_triggered'],
-            'total_processing_time': self.stats['processing_time'],
+            'messages_processed': self._messages_processed,
+            'rules_triggered': self._rules_triggered,
+            'total_processing_time': total_time,
             'average_processing_time': avg_time
         }
-    
+
     def reset_statistics(self):
         """Reset engine statistics"""
-        self.stats = {
-            'messages_processed': 0,
-            'rules_triggered': 0,
-            'processing_time': 0.0
-        }
+        self._messages_processed = 0
+        self._rules_triggered = 0
+        self._total_ns = 0
+        # Re-arm one-shot rules along with the counters
+        self._fired_one_shot.clear()
+        self._memo.cache_clear()
@@ -2,29 +2,337 @@
 Storage backends for the IoT Rules Engine
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from bisect import bisect_left, bisect_right
+import ast
+import hashlib
+import itertools
+import operator
 import sqlite3
-import json
+
+
+# AST node types allowed in rule conditions; anything else falls back to
+# the plain compiled-eval path
+_ALLOWED_NODES = (
+    ast.Expression, ast.Compare, ast.BoolOp, ast.BinOp, ast.UnaryOp,
+    ast.Name, ast.Constant, ast.Load,
+    ast.And, ast.Or, ast.Not,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.USub, ast.UAdd,
+)
+
+
+class _NameToSubscript(ast.NodeTransformer):
+    """Rewrite bare names into subscript lookups on the message argument"""
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            return ast.Subscript(
+                value=ast.Name(id='m', ctx=ast.Load()),
+                slice=ast.Constant(value=node.id),
+                ctx=ast.Load()
+            )
+        return node
+
+
+class _NameToAttribute(ast.NodeTransformer):
+    """Rewrite bare names into attribute loads on the context argument"""
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            return ast.copy_location(
+                ast.Attribute(
+                    value=ast.Name(id='ctx', ctx=ast.Load()),
+                    attr=node.id,
+                    ctx=ast.Load()
+                ), node)
+        return node
+
+
+def _content_rule_id(condition: str, action: str) -> str:
+    """Deterministic rule id derived from the rule's content
+
+    Unlike hash(), this is stable across interpreter runs, so reloading
+    the same rule set produces the same ids.
+    """
+    digest = hashlib.blake2b(
+        f'{condition}\x00{action}'.encode(), digest_size=8
+    )
+    return digest.hexdigest()
+
+
+def _referenced_fields(condition: str) -> Optional[frozenset]:
+    """Collect the message field names a condition refers to"""
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    return frozenset(
+        node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+    )
+
+
+def _match_simple_comparison(condition: str) -> Optional[Tuple[str, str, float]]:
+    """Recognize conditions of the form `<field> <op> <number>`
+
+    Returns (field, op, threshold) for >, >=, <, <= and == comparisons
+    against a numeric constant, or None for any other shape.
+    """
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    node = tree.body
+    if not (isinstance(node, ast.Compare)
+            and len(node.ops) == 1
+            and isinstance(node.left, ast.Name)
+            and isinstance(node.ops[0], (ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq))):
+        return None
+    comparator = node.comparators[0]
+    # Signed thresholds parse as a unary op over the constant, e.g.
+    # `temperature < -10` is UnaryOp(USub, Constant(10))
+    sign = 1
+    if (isinstance(comparator, ast.UnaryOp)
+            and isinstance(comparator.op, (ast.USub, ast.UAdd))):
+        if isinstance(comparator.op, ast.USub):
+            sign = -1
+        comparator = comparator.operand
+    if not (isinstance(comparator, ast.Constant)
+            and type(comparator.value) in (int, float)):
+        return None
+    op = {ast.Gt: '>', ast.GtE: '>=', ast.Lt: '<', ast.LtE: '<=',
+          ast.Eq: '=='}[type(node.ops[0])]
+    return (node.left.id, op, sign * comparator.value)
+
+
+def condition_source(condition: str) -> Optional[str]:
+    """Rewrite a condition into source text evaluating against a dict `m`
+
+    Returns e.g. "m['temperature'] > 25", or None when the condition is
+    not a supported expression. Used for runtime code generation.
+    """
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    if not all(isinstance(node, _ALLOWED_NODES) for node in ast.walk(tree)):
+        return None
+    return ast.unparse(_NameToSubscript().visit(tree))
+
+
+def _build_predicate(condition: str):
+    """Build a `lambda m: <condition>` with names rewritten to m['name']"""
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    if not all(isinstance(node, _ALLOWED_NODES) for node in ast.walk(tree)):
+        return None
+    lambda_tree = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[], args=[ast.arg(arg='m')], vararg=None,
+                kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+            ),
+            body=_NameToSubscript().visit(tree).body
+        )
+    )
+    ast.fix_missing_locations(lambda_tree)
+    return eval(compile(lambda_tree, '<rule>', 'eval'), {'__builtins__': {}})
+
+
+def _build_attr_predicate(condition: str):
+    """Build a `lambda ctx: <condition>` reading fields as attributes
+
+    Attribute loads on a fixed-shape __slots__ object hit CPython's
+    inline caches, unlike per-name dict lookups. The engine supplies a
+    matching context object; see RulesEngine._message_context.
+    """
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    if not all(isinstance(node, _ALLOWED_NODES) for node in ast.walk(tree)):
+        return None
+    lambda_tree = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[], args=[ast.arg(arg='ctx')], vararg=None,
+                kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+            ),
+            body=_NameToAttribute().visit(tree).body
+        )
+    )
+    ast.fix_missing_locations(lambda_tree)
+    return eval(compile(lambda_tree, '<rule>', 'eval'), {'__builtins__': {}})
+
+
+_CMP_OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt,
+            '<=': operator.le, '==': operator.eq}
 
 
 class Rule:
     """Represents a rule in the system"""
+
+    __slots__ = ('id', 'condition', 'action', 'compiled', 'predicate',
+                 'attr_predicate', 'fields', 'simple', 'fast', 'kernel',
+                 'one_shot', 'action_idx', '_dict_cache')
+
     def __init__(self, condition: str, action: str, rule_id: Optional[str] = None):
         self.id = rule_id
         self.condition = condition
         self.action = action
-    
+        self.predicate = _build_predicate(condition)
+        self.attr_predicate = (_build_attr_predicate(condition)
+                               if self.predicate is not None else None)
+        # The plain eval fallback is only needed when no predicate exists
+        self.compiled = self._compile(condition) if self.predicate is None else None
+        self.fields = _referenced_fields(condition)
+        self.simple = _match_simple_comparison(condition)
+        # C-level comparison for the canonical `<field> <op> <number>`
+        # shape: one operator call instead of an interpreted expression
+        self.fast = None
+        if self.simple is not None:
+            field, op, threshold = self.simple
+            self.fast = (field, _CMP_OPS[op], threshold)
+        # Optional JIT-compiled batch kernel (None = not built yet,
+        # False = tried and unsupported); owned by the engine
+        self.kernel = None
+        # One-shot rules are retired by the engine after their first fire
+        self.one_shot = False
+        # Slot in the engine's action table, filled in when it snapshots
+        self.action_idx = None
+
+    @staticmethod
+    def _compile(condition: str):
+        """Compile the condition once so evaluation skips re-parsing"""
+        try:
+            return compile(condition, '<rule>', 'eval')
+        except (SyntaxError, ValueError, TypeError):
+            return None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in ('id', 'condition', 'action'):
+            object.__setattr__(self, '_dict_cache', None)
+
+    def __eq__(self, other):
+        if not isinstance(other, Rule):
+            return NotImplemented
+        return (self.id == other.id
+                and self.condition == other.condition
+                and self.action == other.action)
+
+    def __hash__(self):
+        return hash((self.id, self.condition, self.action))
+
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            'condition': self.condition,
-            'action': self.action
-        }
+        """Get the rule as a dict (cached; treat as read-only)"""
+        cached = self._dict_cache
+        if cached is None:
+            cached = {
+                'id': self.id,
+                'condition': self.condition,
+                'action': self.action
+            }
+            self._dict_cache = cached
+        return cached
+
+
+class RuleIndex:
+    """Field and range index over a set of rules
+
+    Simple `<field> <op> <number>` rules live in per-field sorted
+    threshold lists resolved by bisect; other rules are bucketed by the
+    fields they reference so only relevant ones are evaluated.
+    """
+
+    def __init__(self, rules=()):
+        self.clear()
+        for rule in rules:
+            self.add(rule)
+
+    def clear(self) -> None:
+        self.by_field = {}
+        self.unindexed = []
+        # Sorted (thresholds, entries) pairs per field; entry = (inclusive, rule)
+        self.gt_rules = {}
+        self.lt_rules = {}
+        # field -> {constant: [rules]} for equality comparisons
+        self.eq_rules = {}
+
+    def add(self, rule: Rule) -> None:
+        if rule.simple is not None:
+            field, op, threshold = rule.simple
+            if op == '==':
+                self.eq_rules.setdefault(field, {}).setdefault(threshold, []).append(rule)
+                return
+            index = self.gt_rules if op in ('>', '>=') else self.lt_rules
+            thresholds, entries = index.setdefault(field, ([], []))
+            idx = bisect_left(thresholds, threshold)
+            thresholds.insert(idx, threshold)
+            entries.insert(idx, (op in ('>=', '<='), rule))
+        elif rule.fields:
+            for field in rule.fields:
+                self.by_field.setdefault(field, []).append(rule)
+        else:
+            self.unindexed.append(rule)
+
+    def candidates(self, message: Dict[str, Any]) -> List[Rule]:
+        """Get non-simple rules whose fields are all present in the message"""
+        keys = message.keys()
+        candidates = []
+        seen = set()
+        for key in keys:
+            for rule in self.by_field.get(key, ()):
+                if id(rule) not in seen and rule.fields <= keys:
+                    seen.add(id(rule))
+                    candidates.append(rule)
+        candidates.extend(self.unindexed)
+        return candidates
+
+    def match_simple(self, message: Dict[str, Any]) -> List[Rule]:
+        """Get simple threshold rules that fire for the message"""
+        matched = []
+        for field, value in message.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            eq = self.eq_rules.get(field)
+            if eq is not None:
+                matched.extend(eq.get(value, ()))
+            gt = self.gt_rules.get(field)
+            if gt is not None:
+                thresholds, entries = gt
+                # Every threshold strictly below the value fires
+                idx = bisect_left(thresholds, value)
+                matched.extend(rule for _, rule in entries[:idx])
+                while idx < len(thresholds) and thresholds[idx] == value:
+                    inclusive, rule = entries[idx]
+                    if inclusive:
+                        matched.append(rule)
+                    idx += 1
+            lt = self.lt_rules.get(field)
+            if lt is not None:
+                thresholds, entries = lt
+                # Every threshold strictly above the value fires
+                idx = bisect_right(thresholds, value)
+                matched.extend(rule for _, rule in entries[idx:])
+                idx -= 1
+                while idx >= 0 and thresholds[idx] == value:
+                    inclusive, rule = entries[idx]
+                    if inclusive:
+                        matched.append(rule)
+                    idx -= 1
+        return matched
 
 
 class StorageBackend(ABC):
     """Abstract base class for storage backends"""
-    
+
+    def __init__(self):
+        # Bumped on every mutation so callers can cache rules cheaply
+        self.version = 0
+
     @abstractmethod
     def add_rule(self, rule: Rule) -> str:
         """Add a rule and return its ID"""
@@ -50,92 +358,220 @@ class StorageBackend(ABC):
         """Clear all rules"""
         pass
 
+    def add_rules(self, rules: List[Rule]) -> List[str]:
+        """Add several rules; backends may override to batch the writes"""
+        return [self.add_rule(rule) for rule in rules]
+
+    def get_candidate_rules(self, message: Dict[str, Any]) -> List[Rule]:
+        """Get rules whose referenced fields are all present in the message
+
+        Rules referencing missing fields can never fire, so they are safe
+        to skip. Rules whose fields could not be determined are included.
+        """
+        keys = message.keys()
+        return [
+            rule for rule in self.get_all_rules()
+            if rule.fields is None or rule.fields <= keys
+        ]
+
+    def match_simple_rules(self, message: Dict[str, Any]) -> List[Rule]:
+        """Get rules already known to fire without evaluating their condition
+
+        Backends that maintain a range index over simple threshold rules
+        override this; such rules are then excluded from candidates.
+        """
+        return []
+
 
 class InMemoryStorage(StorageBackend):
     """In-memory storage using Python lists"""
     
     def __init__(self):
+        super().__init__()
         self.rules = {}
-        self.next_id = 1
-    
+        self._id_gen = itertools.count(1)
+        self.index = RuleIndex()
+        # Contiguous list view returned by get_all_rules, kept in sync
+        # via swap-and-pop deletes; _positions maps rule id -> list slot
+        self._order = []
+        self._positions = {}
+
     def add_rule(self, rule: Rule) -> str:
-        rule_id = str(self.next_id)
+        rule_id = str(next(self._id_gen))
         rule.id = rule_id
         self.rules[rule_id] = rule
-        self.next_id += 1
+        self._positions[rule_id] = len(self._order)
+        self._order.append(rule)
+        self.index.add(rule)
+        self.version += 1
         return rule_id
-    
+
+    def _rebuild_index(self) -> None:
+        self.index = RuleIndex(self._order)
+
     def get_rule(self, rule_id: str) -> Optional[Rule]:
         return self.rules.get(rule_id)
-    
+
     def get_all_rules(self) -> List[Rule]:
-        return list(self.rules.values())
-    
+        """Get all rules as a shared list view; treat it as read-only"""
+        return self._order
+
     def delete_rule(self, rule_id: str) -> bool:
-        if rule_id in self.rules:
-            del self.rules[rule_id]
-            return True
-        return False
-    
+        position = self._positions.pop(rule_id, None)
+        if position is None:
+            return False
+        del self.rules[rule_id]
+        last = self._order.pop()
+        if position < len(self._order):
+            self._order[position] = last
+            self._positions[last.id] = position
+        self._rebuild_index()
+        self.version += 1
+        return True
+
     def clear_all(self) -> None:
         self.rules.clear()
+        self._id_gen = itertools.count(1)
+        self._order = []
+        self._positions = {}
+        self._rebuild_index()
+        self.version += 1
+
+    def get_candidate_rules(self, message: Dict[str, Any]) -> List[Rule]:
+        return self.index.candidates(message)
+
+    def match_simple_rules(self, message: Dict[str, Any]) -> List[Rule]:
+        return self.index.match_simple(message)
 
 
 class SQLiteStorage(StorageBackend):
     """SQLite database storage"""
-    
+
+    _SQL_INSERT = ('INSERT OR REPLACE INTO rules (id, condition, action, one_shot) '
+                   'VALUES (?, ?, ?, ?)')
+    _SQL_SELECT_ONE = 'SELECT id, condition, action, one_shot FROM rules WHERE id = ?'
+    _SQL_SELECT_ALL = 'SELECT id, condition, action, one_shot FROM rules'
+    _SQL_DELETE = 'DELETE FROM rules WHERE id = ?'
+    _SQL_DELETE_ALL = 'DELETE FROM rules'
+
     def __init__(self, db_path: str = ":memory:"):
+        super().__init__()
         self.db_path = db_path
         self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
         self._create_table()
-    
+        # Rows come back as Rule objects directly, skipping the
+        # fetchall-then-convert second pass; reusing one cursor with the
+        # constant SQL strings above keeps statements in sqlite's cache
+        self.conn.row_factory = SQLiteStorage._rule_from_row
+        self._cursor = self.conn.cursor()
+
     def _create_table(self):
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS rules (
                 id TEXT PRIMARY KEY,
                 condition TEXT NOT NULL,
-                action TEXT NOT NULL
+                action TEXT NOT NULL,
+                one_shot INTEGER NOT NULL DEFAULT 0
             )
         ''')
+        try:
+            # Databases created before the one_shot column existed
+            self.conn.execute(
+                'ALTER TABLE rules ADD COLUMN one_shot INTEGER NOT NULL DEFAULT 0')
+        except sqlite3.OperationalError:
+            pass
         self.conn.commit()
+
+    @staticmethod
+    def _rule_from_row(cursor, row) -> Rule:
+        rule = Rule(row[1], row[2], row[0])
+        rule.one_shot = bool(row[3])
+        return rule
     
     def add_rule(self, rule: Rule) -> str:
-        rule_id = str(hash(rule.condition + rule.action))
+        rule_id = _content_rule_id(rule.condition, rule.action)
         rule.id = rule_id
-        self.conn.execute(
-            'INSERT OR REPLACE INTO rules (id, condition, action) VALUES (?, ?, ?)',
-            (rule_id, rule.condition, rule.action)
-        )
-        self.conn.commit()
+        self._cursor.execute(self._SQL_INSERT,
+                             (rule_id, rule.condition, rule.action,
+                              int(rule.one_shot)))
+        # Commit is deferred to flush()/delete/clear so bulk adds pay for
+        # a single transaction instead of one per insert
+        self.version += 1
         return rule_id
+
+    def add_rules(self, rules: List[Rule]) -> List[str]:
+        """Insert several rules in one executemany within one transaction"""
+        rows = []
+        rule_ids = []
+        for rule in rules:
+            rule_id = _content_rule_id(rule.condition, rule.action)
+            rule.id = rule_id
+            rule_ids.append(rule_id)
+            rows.append((rule_id, rule.condition, rule.action,
+                         int(rule.one_shot)))
+        with self.conn:
+            self._cursor.executemany(self._SQL_INSERT, rows)
+        self.version += 1
+        return rule_ids
+
+    def flush(self) -> None:
+        """Commit any pending inserts"""
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Flush pending writes and release the connection"""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
     
     def get_rule(self, rule_id: str) -> Optional[Rule]:
-        cursor = self.conn.execute(
-            'SELECT id, condition, action FROM rules WHERE id = ?',
-            (rule_id,)
-        )
-        row = cursor.fetchone()
-        if row:
-            return Rule(row[1], row[2], row[0])
-        return None
-    
+        return self._cursor.execute(self._SQL_SELECT_ONE, (rule_id,)).fetchone()
+
     def get_all_rules(self) -> List[Rule]:
-        cursor = self.conn.execute('SELECT id, condition, action FROM rules')
-        return [Rule(row[1], row[2], row[0]) for row in cursor.fetchall()]
-    
+        return self._cursor.execute(self._SQL_SELECT_ALL).fetchall()
+
     def delete_rule(self, rule_id: str) -> bool:
-        cursor = self.conn.execute('DELETE FROM rules WHERE id = ?', (rule_id,))
+        cursor = self._cursor.execute(self._SQL_DELETE, (rule_id,))
         self.conn.commit()
-        return cursor.rowcount > 0
-    
+        if cursor.rowcount > 0:
+            self.version += 1
+            return True
+        return False
+
+    def delete_rules(self, rule_ids: List[str]) -> int:
+        """Delete several rules in a single statement"""
+        if not rule_ids:
+            return 0
+        placeholders = ','.join('?' * len(rule_ids))
+        cursor = self._cursor.execute(
+            f'DELETE FROM rules WHERE id IN ({placeholders})', rule_ids
+        )
+        self.conn.commit()
+        if cursor.rowcount > 0:
+            self.version += 1
+        return cursor.rowcount
+
     def clear_all(self) -> None:
-        self.conn.execute('DELETE FROM rules')
+        self._cursor.execute(self._SQL_DELETE_ALL)
         self.conn.commit()
+        self.version += 1
 
 
 class RedisStorage(StorageBackend):
     """Redis storage (optional, requires redis package)"""
     
+    VERSION_KEY = "rules:version"
+    INDEX_KEY = "rules:index"
+
     def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0):
         try:
             import redis
@@ -149,49 +585,102 @@ class RedisStorage(StorageBackend):
     
     def _get_key(self, rule_id: str) -> str:
         return f"rule:{rule_id}"
-    
+
+    @property
+    def version(self) -> int:
+        # Kept in Redis itself so external mutations are detected too
+        if self.redis is None:
+            return self.fallback.version
+        value = self.redis.get(self.VERSION_KEY)
+        return int(value) if value else 0
+
     def add_rule(self, rule: Rule) -> str:
         if self.redis is None:
             return self.fallback.add_rule(rule)
-        
-        rule_id = str(hash(rule.condition + rule.action))
+
+        rule_id = _content_rule_id(rule.condition, rule.action)
         rule.id = rule_id
-        self.redis.set(self._get_key(rule_id), json.dumps(rule.to_dict()))
+        # Hash fields are kept short ('c'/'a') to cut bytes on the wire;
+        # one pipeline collapses the three writes into a single round trip
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self._get_key(rule_id),
+                      mapping={'c': rule.condition, 'a': rule.action,
+                               'o': int(rule.one_shot)})
+            pipe.sadd(self.INDEX_KEY, rule_id)
+            pipe.incr(self.VERSION_KEY)
+            pipe.execute()
         return rule_id
-    
+
+    def add_rules(self, rules: List[Rule]) -> List[str]:
+        """Add many rules in one pipelined round trip"""
+        if self.redis is None:
+            return self.fallback.add_rules(rules)
+
+        rule_ids = []
+        with self.redis.pipeline(transaction=False) as pipe:
+            for rule in rules:
+                rule_id = _content_rule_id(rule.condition, rule.action)
+                rule.id = rule_id
+                rule_ids.append(rule_id)
+                pipe.hset(self._get_key(rule_id),
+                          mapping={'c': rule.condition, 'a': rule.action,
+                                   'o': int(rule.one_shot)})
+                pipe.sadd(self.INDEX_KEY, rule_id)
+            pipe.incr(self.VERSION_KEY)
+            pipe.execute()
+        return rule_ids
+
     def get_rule(self, rule_id: str) -> Optional[Rule]:
         if self.redis is None:
             return self.fallback.get_rule(rule_id)
-        
-        data = self.redis.get(self._get_key(rule_id))
+
+        data = self.redis.hgetall(self._get_key(rule_id))
         if data:
-            rule_dict = json.loads(data)
-            return Rule(rule_dict['condition'], rule_dict['action'], rule_dict['id'])
+            return self._rule_from_hash(rule_id, data)
         return None
     
     def get_all_rules(self) -> List[Rule]:
         if self.redis is None:
             return self.fallback.get_all_rules()
-        
-        keys = self.redis.keys("rule:*")
-        rules = []
-        for key in keys:
-            data = self.redis.get(key)
-            if data:
-                rule_dict = json.loads(data)
-                rules.append(Rule(rule_dict['condition'], rule_dict['action'], rule_dict['id']))
-        return rules
-    
+
+        # One SMEMBERS for the id set, then every HGETALL in a single
+        # pipelined round trip instead of one request per rule
+        rule_ids = list(self.redis.smembers(self.INDEX_KEY))
+        if not rule_ids:
+            return []
+        with self.redis.pipeline(transaction=False) as pipe:
+            for rule_id in rule_ids:
+                pipe.hgetall(self._get_key(rule_id))
+            hashes = pipe.execute()
+        return [self._rule_from_hash(rule_id, data)
+                for rule_id, data in zip(rule_ids, hashes) if data]
+
+    @staticmethod
+    def _rule_from_hash(rule_id: str, data: Dict[str, str]) -> Rule:
+        rule = Rule(data['c'], data['a'], rule_id)
+        rule.one_shot = data.get('o') == '1'
+        return rule
+
     def delete_rule(self, rule_id: str) -> bool:
         if self.redis is None:
             return self.fallback.delete_rule(rule_id)
-        
-        return self.redis.delete(self._get_key(rule_id)) > 0
-    
+
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self._get_key(rule_id))
+            pipe.srem(self.INDEX_KEY, rule_id)
+            deleted = pipe.execute()[0] > 0
+        if deleted:
+            self.redis.incr(self.VERSION_KEY)
+        return deleted
+
     def clear_all(self) -> None:
         if self.redis is None:
             return self.fallback.clear_all()
-        
-        keys = self.redis.keys("rule:*")
-        if keys:
-            self.redis.delete(*keys)
+
+        rule_ids = self.redis.smembers(self.INDEX_KEY)
+        with self.redis.pipeline(transaction=False) as pipe:
+            if rule_ids:
+                pipe.delete(*(self._get_key(rule_id) for rule_id in rule_ids))
+            pipe.delete(self.INDEX_KEY)
+            pipe.incr(self.VERSION_KEY)
+            pipe.execute()
@@ -0,0 +1,8 @@
+"""
+Make the project root importable for the test suite
+"""
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
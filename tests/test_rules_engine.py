@@ -3,10 +3,6 @@ Simple tests for IoT Rules Engine
 """
 
 import unittest
-import tempfile
-import os
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from rules_engine.storage import InMemoryStorage, SQLiteStorage, RedisStorage, Rule
 from rules_engine.engine import RulesEngine
@@ -33,105 +29,144 @@ class TestRule(unittest.TestCase):
         self.assertEqual(rule_dict, expected)
 
 
-class TestInMemoryStorage(unittest.TestCase):
-    """Test InMemory storage backend"""
-    
+class _StorageContract:
+    """Shared contract tests run against every storage backend
+
+    Subclasses set STORAGE_FACTORY; the backend is built once per class
+    and emptied between tests.
+    """
+
+    STORAGE_FACTORY = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.storage = cls.STORAGE_FACTORY()
+
     def setUp(self):
-        self.storage = InMemoryStorage()
-    
+        self.storage.clear_all()
+
     def test_add_and_get_rule(self):
         rule = Rule("temperature > 25", "High temperature alert")
         rule_id = self.storage.add_rule(rule)
-        
+
         retrieved_rule = self.storage.get_rule(rule_id)
         self.assertIsNotNone(retrieved_rule)
         self.assertEqual(retrieved_rule.condition, "temperature > 25")
         self.assertEqual(retrieved_rule.action, "High temperature alert")
         self.assertEqual(retrieved_rule.id, rule_id)
-    
+
     def test_get_all_rules(self):
         rule1 = Rule("temperature > 25", "High temperature alert")
         rule2 = Rule("humidity < 30", "Low humidity warning")
-        
+
         self.storage.add_rule(rule1)
         self.storage.add_rule(rule2)
-        
+
         all_rules = self.storage.get_all_rules()
         self.assertEqual(len(all_rules), 2)
-    
+
+    def test_delete_rule(self):
         rule = Rule("temperature > 25", "High temperature alert")
         rule_id = self.storage.add_rule(rule)
-        
+
         # Verify rule exists
         self.assertIsNotNone(self.storage.get_rule(rule_id))
-        
+
         # Delete rule
         deleted = self.storage.delete_rule(rule_id)
         self.assertTrue(deleted)
-        
+
         # Verify rule is gone
         self.assertIsNone(self.storage.get_rule(rule_id))
-    
+
+    def test_add_rules_bulk(self):
+        rules = [
+            Rule("temperature > 25", "High temperature alert"),
+            Rule("humidity < 30", "Low humidity warning")
+        ]
+        rule_ids = self.storage.add_rules(rules)
+
+        self.assertEqual(len(rule_ids), 2)
+        for rule_id in rule_ids:
+            self.assertIsNotNone(self.storage.get_rule(rule_id))
+
     def test_clear_all(self):
         rule1 = Rule("temperature > 25", "High temperature alert")
         rule2 = Rule("humidity < 30", "Low humidity warning")
-        
+
         self.storage.add_rule(rule1)
         self.storage.add_rule(rule2)
-        
+
         self.assertEqual(len(self.storage.get_all_rules()), 2)
-        
+
         self.storage.clear_all()
         self.assertEqual(len(self.storage.get_all_rules()), 0)
 
 
-class TestSQLiteStorage(unittest.TestCase):
-    """Test SQLite storage backend"""
-    
-    def setUp(self):
-        # Use in-memory database for testing
-        self.storage = SQLiteStorage(":memory:")
-    
-    def test_add_and_get_rule(self):
-        rule = Rule("temperature > 25", "High temperature alert")
-        rule_id = self.storage.add_rule(rule)
-        
-        retrieved_rule = self.storage.get_rule(rule_id)
-        self.assertIsNotNone(retrieved_rule)
-        self.assertEqual(retrieved_rule.condition, "temperature > 25")
-        self.assertEqual(retrieved_rule.action, "High temperature alert")
-    
-    def test_get_all_rules(self):
+class TestInMemoryStorage(_StorageContract, unittest.TestCase):
+    """Test InMemory storage backend"""
+
+    STORAGE_FACTORY = InMemoryStorage
+
+    def test_get_candidate_rules(self):
+        rule1 = Rule("temperature > 25 and humidity < 30", "Dry heat alert")
+        rule2 = Rule("pressure > 1013 and pressure < 1050", "Pressure band")
+
+        self.storage.add_rule(rule1)
+        self.storage.add_rule(rule2)
+
+        candidates = self.storage.get_candidate_rules({"temperature": 30, "humidity": 20})
+        self.assertEqual([r.action for r in candidates], ["Dry heat alert"])
+
+        candidates = self.storage.get_candidate_rules({"timestamp": 0})
+        self.assertEqual(candidates, [])
+
+    def test_match_simple_rules(self):
         rule1 = Rule("temperature > 25", "High temperature alert")
-        rule2 = Rule("humidity < 30", "Low humidity warning")
-        
+        rule2 = Rule("temperature < 0", "Freezing temperature alert")
+
         self.storage.add_rule(rule1)
         self.storage.add_rule(rule2)
-        
-        all_rules = self.storage.get_all_rules()
-        self.assertEqual(len(all_rules), 2)
-    
-    def test_delete_rule(self):
-        rule = Rule("temperature > 25", "High temperature alert")
-        rule_id = self.storage.add_rule(rule)
-        
-        # Verify rule exists
-        self.assertIsNotNone(self.storage.get_rule(rule_id))
-        
-        # Delete rule
-        deleted = self.storage.delete_rule(rule_id)
-        self.assertTrue(deleted)
-        
-        # Verify rule is gone
-        self.assertIsNone(self.storage.get_rule(rule_id))
+
+        matched = self.storage.match_simple_rules({"temperature": 30})
+        self.assertEqual([r.action for r in matched], ["High temperature alert"])
+
+        matched = self.storage.match_simple_rules({"temperature": -5})
+        self.assertEqual([r.action for r in matched], ["Freezing temperature alert"])
+
+        self.assertEqual(self.storage.match_simple_rules({"temperature": 10}), [])
+
+        rule3 = Rule("humidity == 50", "Exact humidity")
+        self.storage.add_rule(rule3)
+        matched = self.storage.match_simple_rules({"humidity": 50})
+        self.assertEqual([r.action for r in matched], ["Exact humidity"])
+
+        # Negative thresholds are simple comparisons too
+        rule4 = Rule("temperature < -10", "Extreme cold")
+        self.storage.add_rule(rule4)
+        matched = self.storage.match_simple_rules({"temperature": -20})
+        self.assertEqual(sorted(r.action for r in matched),
+                         ["Extreme cold", "Freezing temperature alert"])
+
+
+class TestSQLiteStorage(_StorageContract, unittest.TestCase):
+    """Test SQLite storage backend"""
+
+    # One in-memory database per class; setUp just empties it
+    STORAGE_FACTORY = staticmethod(lambda: SQLiteStorage(":memory:"))
 
 
 class TestRulesEngine(unittest.TestCase):
     """Test Rules Engine"""
-    
+
+    @classmethod
+    def setUpClass(cls):
+        cls.storage = InMemoryStorage()
+        cls.engine = RulesEngine(cls.storage)
+
     def setUp(self):
-        self.storage = InMemoryStorage()
-        self.engine = RulesEngine(self.storage)
+        self.storage.clear_all()
+        self.engine.reset_statistics()
     
     def test_add_rule(self):
         rule_id = self.engine.add_rule("temperature > 25", "High temperature alert")
@@ -165,6 +200,99 @@ class TestRulesEngine(unittest.TestCase):
         self.assertIn("Low humidity warning", actions2)
         self.assertIn("High pressure detected", actions2)
     
+    def test_process_batch(self):
+        self.engine.add_rule("temperature > 25", "High temperature alert")
+        self.engine.add_rule("humidity < 30", "Low humidity warning")
+        self.engine.add_rule("pressure > 1013", "High pressure detected")
+
+        messages = [
+            {"temperature": 30, "humidity": 50, "pressure": 1000},
+            {"temperature": 30, "humidity": 20, "pressure": 1020},
+            {"temperature": 10, "humidity": 50, "pressure": 1000},
+        ]
+        results = self.engine.process_batch(messages)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], ["High temperature alert"])
+        self.assertEqual(sorted(results[1]),
+                         ["High pressure detected", "High temperature alert",
+                          "Low humidity warning"])
+        self.assertEqual(results[2], [])
+
+        stats = self.engine.get_statistics()
+        self.assertEqual(stats['messages_processed'], 3)
+        self.assertEqual(stats['rules_triggered'], 4)
+
+    def test_overlapping_field_names(self):
+        # The legacy string-substitution evaluator corrupted conditions
+        # when one field name was a prefix of another (temp/temperature)
+        self.engine.add_rule("temp > 5", "Temp sensor alert")
+        self.engine.add_rule("temperature > 25", "High temperature alert")
+
+        actions = self.engine.process_message({"temp": 10, "temperature": 20})
+        self.assertEqual(actions, ["Temp sensor alert"])
+
+        actions = self.engine.process_message({"temp": 0, "temperature": 30})
+        self.assertEqual(actions, ["High temperature alert"])
+
+    def test_invalid_condition_rejected(self):
+        with self.assertRaises(ValueError):
+            self.engine.add_rule("temperature >>> 25", "Broken rule")
+
+        with self.assertRaises(ValueError):
+            self.engine.add_rule("__import__('os')", "Dangerous rule")
+
+        self.engine.add_rule("temperature > 25", "High temperature alert")
+        actions = self.engine.process_message({"temperature": 30})
+        self.assertEqual(actions, ["High temperature alert"])
+
+    def test_one_shot_rule(self):
+        self.engine.add_rule("temperature > 25", "High temperature alert",
+                             one_shot=True)
+        self.engine.add_rule("humidity < 30", "Low humidity warning")
+
+        message = {"temperature": 30, "humidity": 20}
+        actions = self.engine.process_message(message)
+        self.assertEqual(sorted(actions),
+                         ["High temperature alert", "Low humidity warning"])
+
+        # The one-shot rule is retired after its first fire
+        actions = self.engine.process_message(message)
+        self.assertEqual(actions, ["Low humidity warning"])
+
+        # reset_statistics re-arms one-shot rules
+        self.engine.reset_statistics()
+        actions = self.engine.process_message(message)
+        self.assertEqual(sorted(actions),
+                         ["High temperature alert", "Low humidity warning"])
+
+    def test_one_shot_rule_persistent_backend(self):
+        engine = RulesEngine(SQLiteStorage(":memory:"))
+        engine.add_rule("temperature > 25", "High temperature alert",
+                        one_shot=True)
+
+        message = {"temperature": 30}
+        actions = engine.process_message(message)
+        self.assertEqual(actions, ["High temperature alert"])
+
+        # The flag survives the storage round trip
+        actions = engine.process_message(message)
+        self.assertEqual(list(actions), [])
+
+    def test_one_shot_rule_batch(self):
+        self.engine.add_rule("temperature > 25", "High temperature alert",
+                             one_shot=True)
+        self.engine.add_rule("humidity < 30", "Low humidity warning")
+
+        results = self.engine.process_batch([
+            {"temperature": 30, "humidity": 20},
+            {"temperature": 30, "humidity": 20},
+        ])
+        self.assertEqual(sorted(results[0]),
+                         ["High temperature alert", "Low humidity warning"])
+        # The one-shot rule retires after the first message of the batch
+        self.assertEqual(results[1], ["Low humidity warning"])
+
     def test_statistics(self):
         # Add a rule
         self.engine.add_rule("temperature > 25", "High temperature alert")